@@ -7,14 +7,61 @@ based on age, type, and importance.
 
 import os
 import sys
+import errno
 import argparse
 from pathlib import Path
-from datetime import datetime, timedelta
 import yaml
+import json
+import time
 import shutil
 import re
+import fnmatch
+import itertools
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Buffered output lines are written to stdout in batches of this size
+LOG_FLUSH_LINES = 256
+
+
+def _compile_glob(*patterns):
+    """Compile shell-style patterns into one case-insensitive regex"""
+    return re.compile('|'.join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+
+
+# Names always skipped during cleanup (hidden dot-entries are skipped too)
+SKIP_NAMES = frozenset((
+    '_archive',       # Our own archive folder
+    '.DS_Store',      # macOS folder metadata
+    '.localized',     # macOS folder name localization
+    'Thumbs.db',      # Windows thumbnail cache
+    'desktop.ini',    # Windows folder settings
+    '.Spotlight-V100', # macOS Spotlight index
+    '.Trashes',       # macOS trash folder
+    '.fseventsd'      # macOS file system events
+))
+
+# Per-item details gathered once at scan time and passed to _execute_action
+EntryInfo = namedtuple('EntryInfo', ['path', 'name', 'stem', 'suffix', 'is_dir'])
+
 
 class FolderCleanup:
+    __slots__ = (
+        'config', 'cleanup_rules', 'file_categories', 'important_patterns',
+        'safe_directories', 'dry_run',
+        '_important_compiled', '_ext_to_category', '_age_rules',
+        '_category_rules', '_category_rule_keys', '_folder_rules',
+        '_organize_targets', '_safe_paths', '_skip_names',
+        '_dest_lock', '_claimed_dests', '_ensured_dirs', '_log', '_now_ts'
+    )
+
     def __init__(self, config_path='config.yaml'):
         self.config = self._load_config(config_path)
         self.cleanup_rules = self.config.get('cleanup_rules', {})
@@ -22,95 +69,147 @@ class FolderCleanup:
         self.important_patterns = self.config.get('important_patterns', {})
         self.safe_directories = self.config.get('safe_cleanup_directories', [])
         self.dry_run = False
+        self._dest_lock = threading.Lock()
+        self._claimed_dests = set()
+        self._ensured_dirs = set()
+        self._log = []
+        self._now_ts = time.time()
+
+        # Rule lookups used for every file. Age rules are sorted oldest
+        # first so the first match is the most specific rule.
+        self._age_rules = sorted(
+            self.cleanup_rules.get('by_age') or [],
+            key=lambda rule: -rule.get('days', 0)
+        )
+        self._category_rules = self.cleanup_rules.get('by_category') or {}
+        self._category_rule_keys = frozenset(self._category_rules)
+        self._folder_rules = self.cleanup_rules.get('folders') or {}
+        self._organize_targets = {
+            category: str(Path(rules['organize_to']).expanduser())
+            for category, rules in self._category_rules.items()
+            if rules and 'organize_to' in rules
+        }
+        self._safe_paths = self._resolve_safe_directories()
+        self._skip_names = SKIP_NAMES | frozenset(self.cleanup_rules.get('skip_names') or ())
+
+        # Compile each category's patterns once into a single alternation
+        self._important_compiled = {
+            category: _compile_glob(*patterns)
+            for category, patterns in self.important_patterns.items()
+            if patterns
+        }
 
-    def _load_config(self, config_path):
-        """Load configuration from YAML file"""
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f) or {}
-        return {}
-
-    def _matches_pattern(self, filename, pattern):
-        """Check if filename matches a pattern"""
-        pattern = pattern.replace('.', r'\.')
-        pattern = pattern.replace('*', '.*')
-        pattern = pattern.replace('?', '.')
-        return re.search(pattern, filename, re.IGNORECASE) is not None
-
-    def _is_important_file(self, file_path):
-        """Check if file is marked as important"""
-        filename = os.path.basename(file_path)
-        for category, patterns in self.important_patterns.items():
-            for pattern in patterns:
-                if self._matches_pattern(filename, pattern):
-                    return True, category
-        return False, None
-
-    def _get_file_category(self, file_path):
-        """Determine file category based on extension"""
-        ext = Path(file_path).suffix.lower()
-
+        # Invert categories to an extension lookup (first category wins)
+        self._ext_to_category = {}
         for category, extensions in self.file_categories.items():
-            if ext in extensions:
-                return category
+            for ext in extensions or ():
+                self._ext_to_category.setdefault(ext.lower(), category)
 
-        return 'other'
+    def _load_config(self, config_path):
+        """Load configuration from YAML file, reusing a JSON cache if fresh"""
+        if not os.path.exists(config_path):
+            return {}
+
+        # The parsed config is cached next to the YAML file and reused until
+        # the YAML changes - json is much faster to load than YAML
+        cache_path = config_path + '.cache.json'
+        st = os.stat(config_path)
+        source = [st.st_mtime_ns, st.st_size]
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached['source'] == source:
+                return cached['config']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
 
-    def _get_file_age_days(self, file_path):
-        """Get file age in days"""
-        mtime = os.path.getmtime(file_path)
-        age_seconds = datetime.now().timestamp() - mtime
-        return int(age_seconds / 86400)
+        with open(config_path, 'r') as f:
+            config = yaml.load(f, Loader=SafeLoader) or {}
 
-    def _execute_action(self, action, file_path, target_dir=None):
-        """Execute cleanup action"""
+        try:
+            data = json.dumps({'source': source, 'config': config})
+            with open(cache_path, 'w') as f:
+                f.write(data)
+        except (OSError, TypeError, ValueError):
+            pass  # Caching is best effort (read-only dir, non-JSON values)
+        return config
+
+    def _is_important_file(self, filename):
+        """Check if a file name is marked as important"""
+        for category, regex in self._important_compiled.items():
+            if regex.match(filename):
+                return True, category
+        return False, None
+
+    def _get_file_category(self, ext):
+        """Determine file category based on a lowercased extension"""
+        return self._ext_to_category.get(ext, 'other')
+
+    def _get_file_age_days(self, mtime):
+        """Get file age in days from a modification timestamp"""
+        return int((self._now_ts - mtime) // 86400)
+
+    def _log_line(self, line):
+        """Buffer an output line, flushing in batches"""
+        self._log.append(line)
+        if len(self._log) >= LOG_FLUSH_LINES:
+            self._flush_log()
+
+    def _flush_log(self):
+        """Write buffered output lines to stdout"""
+        if self._log:
+            sys.stdout.write('\n'.join(self._log) + '\n')
+            self._log.clear()
+
+    def _execute_action(self, action, entry_info, target_dir=None):
+        """Execute cleanup action, returning (success, message)"""
+        file_path = entry_info.path
         if self.dry_run:
+            message = None
             if action == 'delete':
-                print(f"  [DRY RUN] Would delete: {file_path}")
+                message = f"  [DRY RUN] Would delete: {file_path}"
             elif action == 'move' and target_dir:
-                print(f"  [DRY RUN] Would move: {file_path} -> {target_dir}")
-            elif action == 'archive':
-                print(f"  [DRY RUN] Would archive: {file_path}")
-            return True
+                message = f"  [DRY RUN] Would move: {file_path} -> {target_dir}"
+            return True, message
 
         try:
             if action == 'delete':
                 os.remove(file_path)
-                print(f"  Deleted: {file_path}")
-                return True
+                return True, f"  Deleted: {file_path}"
             elif action == 'move' and target_dir:
-                Path(target_dir).mkdir(parents=True, exist_ok=True)
-                dest = Path(target_dir) / Path(file_path).name
-                # Handle name conflicts
-                counter = 1
-                while dest.exists():
-                    if Path(file_path).is_file():
-                        stem = Path(file_path).stem
-                        ext = Path(file_path).suffix
-                        dest = Path(target_dir) / f"{stem}_{counter}{ext}"
-                    else:
-                        # For directories, just append counter
-                        dest = Path(target_dir) / f"{Path(file_path).name}_{counter}"
-                    counter += 1
-                shutil.move(file_path, str(dest))
-                item_type = "folder" if Path(file_path).is_dir() else "file"
-                print(f"  Moved {item_type}: {file_path} -> {dest}")
-                return True
-            elif action == 'archive':
-                archive_dir = Path(file_path).parent / '_archive'
-                return self._execute_action('move', file_path, str(archive_dir))
+                # Only create each target directory once per run
+                if target_dir not in self._ensured_dirs:
+                    os.makedirs(target_dir, exist_ok=True)
+                    self._ensured_dirs.add(target_dir)
+                # Handle name conflicts - moves run concurrently, so claim
+                # the destination name under the lock before moving
+                if entry_info.is_dir:
+                    # For directories, just append counter
+                    stem, suffix = entry_info.name, ''
+                else:
+                    stem, suffix = entry_info.stem, entry_info.suffix
+                with self._dest_lock:
+                    dest = os.path.join(target_dir, entry_info.name)
+                    counter = itertools.count(1)
+                    while os.path.exists(dest) or dest in self._claimed_dests:
+                        dest = os.path.join(target_dir, f"{stem}_{next(counter)}{suffix}")
+                    self._claimed_dests.add(dest)
+                try:
+                    # Same-filesystem moves are a single rename syscall
+                    os.rename(file_path, dest)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(file_path, dest)
+                item_type = "folder" if entry_info.is_dir else "file"
+                return True, f"  Moved {item_type}: {file_path} -> {dest}"
         except Exception as e:
-            print(f"  Error: {e}")
-            return False
-
-    def _is_safe_directory(self, directory, allow_any=False):
-        """Check if directory is in the safe list and return config"""
-        if allow_any:
-            return True, {'process_folders': True}
-
-        path = Path(directory).expanduser().resolve()
+            return False, f"  Error: {e}"
+        return False, None
 
-        # Check against safe directories list
+    def _resolve_safe_directories(self):
+        """Map resolved safe directory paths to their config"""
+        safe_paths = {}
         for safe_dir in self.safe_directories:
             # Handle both old format (string) and new format (dict)
             if isinstance(safe_dir, str):
@@ -120,17 +219,32 @@ class FolderCleanup:
                 safe_path = Path(safe_dir['path']).expanduser().resolve()
                 config = safe_dir
 
-            if path == safe_path:
-                return True, config
+            # First entry wins if a directory is listed twice
+            safe_paths.setdefault(str(safe_path), config)
+        return safe_paths
+
+    def _is_safe_directory(self, directory, allow_any=False):
+        """Check if directory is in the safe list and return config"""
+        if allow_any:
+            return True, {'process_folders': True}
+
+        path = Path(directory).expanduser()
+        if not path.exists():
+            return False, {}
 
-        return False, {}
+        # Check against the pre-resolved safe directories
+        config = self._safe_paths.get(str(path.resolve()))
+        if config is None:
+            return False, {}
+        return True, config
 
     def cleanup_directory(self, directory, dry_run=False, allow_any_directory=False, skip_folders=False):
         """Clean up a directory based on rules"""
         self.dry_run = dry_run
-        path = Path(directory).expanduser()
+        self._now_ts = time.time()
+        path = os.path.expanduser(directory)
 
-        if not path.exists():
+        if not os.path.exists(path):
             print(f"Error: Directory '{directory}' does not exist")
             return
 
@@ -170,30 +284,42 @@ class FolderCleanup:
             'important_flagged': 0
         }
 
-        # System files to always skip
-        system_files = {
-            '.DS_Store',      # macOS folder metadata
-            '.localized',     # macOS folder name localization
-            'Thumbs.db',      # Windows thumbnail cache
-            'desktop.ini',    # Windows folder settings
-            '.Spotlight-V100', # macOS Spotlight index
-            '.Trashes',       # macOS trash folder
-            '.fseventsd'      # macOS file system events
-        }
+        # Actions are collected during the scan and executed afterwards as
+        # (message, stat, action, entry_info[, target_dir]) tuples; notices
+        # are queued as (message, None) so output keeps the scan order
+        tasks = []
+        self._claimed_dests = set()
+        self._ensured_dirs = set()
 
         # Get all items in directory (files and folders, non-recursive for safety)
-        for item in path.iterdir():
-            # Skip the archive folder itself
-            if item.name == '_archive':
-                continue
-
-            # Skip system files
-            if item.name in system_files:
+        # scandir caches type and stat info on each entry; take a snapshot
+        # up front since we move items out of the directory as we go
+        with os.scandir(path) as it:
+            entries = list(it)
+
+        # Bind rule lookups to locals for the per-item loop
+        skip_names = self._skip_names
+        category_rules = self._category_rules
+        category_rule_keys = self._category_rule_keys
+        age_rules = self._age_rules
+        folder_rules = self._folder_rules
+        organize_targets = self._organize_targets
+        archive_dir = os.path.join(path, '_archive')
+
+        for entry in entries:
+            name = entry.name
+
+            # Skip the archive folder, system files and hidden items
+            # before touching them
+            if name in skip_names or name.startswith('.'):
                 continue
 
             stats['scanned'] += 1
-            file_path = str(item)
-            is_directory = item.is_dir()
+            file_path = entry.path
+            is_directory = entry.is_dir(follow_symlinks=False)
+            mtime = entry.stat(follow_symlinks=False).st_mtime
+            stem, suffix = os.path.splitext(name)
+            info = EntryInfo(file_path, name, stem, suffix, is_directory)
 
             # Handle directories separately
             if is_directory:
@@ -203,16 +329,15 @@ class FolderCleanup:
                     continue
 
                 # Get folder age (based on modification time)
-                age_days = self._get_file_age_days(file_path)
+                age_days = self._get_file_age_days(mtime)
 
                 # Apply folder-specific rules from config
-                folder_rules = self.cleanup_rules.get('folders', {})
-
                 if folder_rules and 'archive_after_days' in folder_rules:
                     if age_days > folder_rules['archive_after_days']:
-                        print(f"📦 {item.name}/ (folder, age: {age_days} days)")
-                        if self._execute_action('archive', file_path):
-                            stats['archived'] += 1
+                        tasks.append((
+                            f"📦 {name}/ (folder, age: {age_days} days)",
+                            'archived', 'move', info, archive_dir
+                        ))
                         continue
 
                 # If no rules apply, skip the folder
@@ -220,23 +345,24 @@ class FolderCleanup:
                 continue
 
             # For files: check if file is important - skip if it is
-            is_important, importance_category = self._is_important_file(file_path)
+            is_important, importance_category = self._is_important_file(name)
             if is_important:
-                print(f"⚠️  IMPORTANT ({importance_category}): {item.name}")
+                tasks.append((f"⚠️  IMPORTANT ({importance_category}): {name}", None))
                 stats['important_flagged'] += 1
                 stats['skipped'] += 1
                 continue
 
             # Get file properties
-            age_days = self._get_file_age_days(file_path)
-            category = self._get_file_category(file_path)
+            age_days = self._get_file_age_days(mtime)
+            category = self._get_file_category(suffix.lower())
 
             # Apply cleanup rules
             rule_applied = False
 
             # Check category-specific rules
-            if category in self.cleanup_rules.get('by_category', {}):
-                cat_rules = self.cleanup_rules['by_category'][category]
+            # Most files ('other') have no category rules at all
+            if category in category_rule_keys:
+                cat_rules = category_rules[category]
 
                 # Skip if category has no rules (None/null in YAML)
                 if cat_rules is None:
@@ -244,49 +370,80 @@ class FolderCleanup:
 
                 if 'delete_after_days' in cat_rules:
                     if age_days > cat_rules['delete_after_days']:
-                        print(f"🗑️  {item.name} (age: {age_days} days, category: {category})")
-                        if self._execute_action('delete', file_path):
-                            stats['deleted'] += 1
+                        tasks.append((
+                            f"🗑️  {name} (age: {age_days} days, category: {category})",
+                            'deleted', 'delete', info
+                        ))
                         rule_applied = True
                         continue
 
                 if 'archive_after_days' in cat_rules:
                     if age_days > cat_rules['archive_after_days']:
-                        print(f"📦 {item.name} (age: {age_days} days, category: {category})")
-                        if self._execute_action('archive', file_path):
-                            stats['archived'] += 1
+                        tasks.append((
+                            f"📦 {name} (age: {age_days} days, category: {category})",
+                            'archived', 'move', info, archive_dir
+                        ))
                         rule_applied = True
                         continue
 
                 if 'organize_to' in cat_rules:
-                    organize_dir = Path(cat_rules['organize_to']).expanduser()
-                    print(f"📁 {item.name} (category: {category})")
-                    if self._execute_action('move', file_path, str(organize_dir)):
-                        stats['moved'] += 1
+                    organize_dir = organize_targets[category]
+                    tasks.append((
+                        f"📁 {name} (category: {category})",
+                        'moved', 'move', info, organize_dir
+                    ))
                     rule_applied = True
                     continue
 
             # Check general age-based rules
-            age_rules = self.cleanup_rules.get('by_age', [])
             for rule in age_rules:
                 if age_days > rule.get('days', 0):
                     action = rule.get('action')
                     if action == 'delete':
-                        print(f"🗑️  {item.name} (age: {age_days} days)")
-                        if self._execute_action('delete', file_path):
-                            stats['deleted'] += 1
+                        tasks.append((
+                            f"🗑️  {name} (age: {age_days} days)",
+                            'deleted', 'delete', info
+                        ))
                         rule_applied = True
                         break
                     elif action == 'archive':
-                        print(f"📦 {item.name} (age: {age_days} days)")
-                        if self._execute_action('archive', file_path):
-                            stats['archived'] += 1
+                        tasks.append((
+                            f"📦 {name} (age: {age_days} days)",
+                            'archived', 'move', info, archive_dir
+                        ))
                         rule_applied = True
                         break
 
             if not rule_applied:
                 stats['skipped'] += 1
 
+        # Execute collected actions - moves and deletes are I/O bound, so
+        # run them on a thread pool for live runs
+        def run(task):
+            if task[1] is None:
+                return True, None
+            return self._execute_action(*task[2:])
+
+        if dry_run:
+            results = map(run, tasks)
+        else:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(run, tasks))
+
+        for (message, stat, *_), (success, result) in zip(tasks, results):
+            self._log_line(message)
+            if success:
+                if stat:
+                    stats[stat] += 1
+                if result:
+                    self._log_line(result)
+            elif result:
+                # Show errors right away rather than holding them in the buffer
+                self._flush_log()
+                print(result)
+        self._flush_log()
+
         # Print summary
         print(f"\n{'='*80}")
         print("Cleanup Summary")
@@ -12,84 +12,275 @@ from pathlib import Path
 from datetime import datetime
 import yaml
 import re
+import fnmatch
 import json
+import time
 import subprocess
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# orjson is optional - it is much faster for the results/log JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_json(data, indent=False):
+    """Serialize data to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None, default=str).encode()
+
+
+_loads_json = orjson.loads if orjson is not None else json.loads
+
+# AppleScript that moves the file given as its first argument to the Trash
+TRASH_SCRIPT = '''on run argv
+    tell application "Finder" to delete (POSIX file (item 1 of argv) as alias)
+end run'''
+
+# Preview reads at most this many bytes of a file
+PREVIEW_BYTES = 65536
+
+# Directory descriptors the recursive walk keeps open at most at once
+MAX_OPEN_DIR_FDS = 32
+
+# Units for _format_file_size, each 1024 times the previous
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Patterns of the form '*.ext' can be matched by extension alone
+_EXT_PATTERN = re.compile(r'^\*\.[A-Za-z0-9]+$')
 
 class ImportantFileFinder:
     def __init__(self, config_path='config.yaml'):
         self.config = self._load_config(config_path)
         self.important_patterns = self.config.get('important_patterns', {})
         self.quick_destinations = self.config.get('quick_destinations', {})
+        self.exclude_dirs = frozenset(self.config.get('exclude_dirs') or ())
+        self._ext_index, self._category_regexes = self._compile_patterns(
+            self.important_patterns, self.config.get('category_order') or ()
+        )
+
+        # Matches depend only on the file name, and names like README.md or
+        # config.json repeat across directories
+        self._match_cache = lru_cache(maxsize=4096)(self._check_file_importance_impl)
+        self._has_patterns = bool(self._ext_index or self._category_regexes)
 
     def _load_config(self, config_path):
         """Load configuration from YAML file"""
         if os.path.exists(config_path):
             with open(config_path, 'r') as f:
-                return yaml.safe_load(f) or {}
+                return yaml.load(f, Loader=SafeLoader) or {}
         return {}
 
-    def _matches_pattern(self, filename, pattern):
-        """Check if filename matches a pattern (supports wildcards and regex)"""
-        # Convert wildcards to regex
-        pattern = pattern.replace('.', r'\.')
-        pattern = pattern.replace('*', '.*')
-        pattern = pattern.replace('?', '.')
-        return re.search(pattern, filename, re.IGNORECASE) is not None
-
-    def _check_file_importance(self, file_path):
-        """Check if a file matches any important patterns"""
-        filename = os.path.basename(file_path)
-        matches = []
-
-        for category, patterns in self.important_patterns.items():
+    def _compile_patterns(self, important_patterns, category_order=()):
+        """Index plain '*.ext' patterns by extension and compile the rest
+
+        Returns (ext_index, category_regexes): ext_index maps a lowercased
+        extension to the categories it marks, and category_regexes maps each
+        category to one regex for its remaining patterns (or None).
+        Categories named in category_order come first, which sets the order
+        matches are reported in.
+        """
+        ordered = [c for c in category_order if c in important_patterns]
+        ordered += [c for c in important_patterns if c not in ordered]
+
+        ext_index = {}
+        category_regexes = {}
+        for category in ordered:
+            patterns = important_patterns[category]
+            if not patterns:
+                continue
+            residual = []
             for pattern in patterns:
-                if self._matches_pattern(filename, pattern):
-                    matches.append(category)
-                    break
-
-        return matches
+                if _EXT_PATTERN.match(pattern):
+                    ext_index.setdefault(pattern[1:].lower(), set()).add(category)
+                else:
+                    residual.append(pattern)
+            category_regexes[category] = re.compile(
+                '|'.join(f"(?:{fnmatch.translate(p)})" for p in residual),
+                re.IGNORECASE
+            ) if residual else None
+        return ext_index, category_regexes
+
+    def _check_file_importance(self, filename):
+        """Check if a file name matches any important patterns"""
+        return self._match_cache(filename)
+
+    def _check_file_importance_impl(self, filename):
+        """Return the tuple of categories whose patterns match filename"""
+        # Extension patterns are a dict lookup; only the other patterns
+        # need a regex match. rpartition keeps dotfiles like '.env' whole.
+        _, dot, ext = filename.rpartition('.')
+        ext_hits = self._ext_index.get(f".{ext.lower()}", ()) if dot else ()
+
+        return tuple(category for category, regex in self._category_regexes.items()
+                     if category in ext_hits or (regex is not None and regex.match(filename)))
 
     def _format_file_size(self, size_bytes):
         """Format file size in human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
-
-    def _get_file_age_days(self, file_path):
-        """Get file age in days"""
-        mtime = os.path.getmtime(file_path)
-        age_seconds = datetime.now().timestamp() - mtime
-        return int(age_seconds / 86400)
+        # Each unit is 2**10 of the previous one, so the bit length picks it
+        idx = max(0, min((size_bytes.bit_length() - 1) // 10, 4))
+        return f"{size_bytes / (1 << (idx * 10)):.1f} {_SIZE_UNITS[idx]}"
+
+    def _format_timestamp(self, ts):
+        """Format a modification timestamp for display"""
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
+
+    def _parse_legacy_log(self, data):
+        """Return the sessions of a log written by older versions as one JSON
+        document (a list of sessions, or a single session), else None"""
+        try:
+            logs = _loads_json(data)
+        except ValueError:
+            return None
+        if isinstance(logs, dict):
+            return [logs]
+        return logs if isinstance(logs, list) else None
+
+    def _read_action_log(self, log_path):
+        """Yield session entries from an action log (JSON Lines)"""
+        data = Path(log_path).read_bytes()
+        legacy = self._parse_legacy_log(data)
+        if legacy is not None:
+            yield from (entry for entry in legacy if isinstance(entry, dict))
+            return
+
+        # A partly written line shouldn't hide the sessions after it
+        bad_lines = 0
+        for line in data.splitlines():
+            if line.strip():
+                try:
+                    entry = _loads_json(line)
+                except ValueError:
+                    entry = None
+                if not isinstance(entry, dict):
+                    bad_lines += 1
+                    continue
+                yield entry
+        if bad_lines:
+            print(f"Warning: Skipped {bad_lines} unreadable line(s) in {log_path}")
 
     def _load_processed_files(self, log_path):
         """Load list of processed (kept/moved/deleted) files from log"""
-        processed = set()
         if not log_path or not Path(log_path).exists():
-            return processed
+            return frozenset()
 
+        processed = set()
         try:
-            with open(log_path, 'r') as f:
-                logs = json.load(f)
-                if not isinstance(logs, list):
-                    logs = [logs]
-
-                for log_entry in logs:
-                    for action in log_entry.get('actions', []):
-                        if action['action'] in ['KEEP', 'MOVED', 'DELETED', 'TRASHED']:
-                            # For MOVED, use 'from' path
-                            path = action.get('from') or action.get('path')
-                            if path:
-                                processed.add(path)
+            for log_entry in self._read_action_log(log_path):
+                for action in log_entry.get('actions', []):
+                    if action['action'] in ['KEEP', 'MOVED', 'DELETED', 'TRASHED']:
+                        # For MOVED, use 'from' path
+                        path = action.get('from') or action.get('path')
+                        if path:
+                            processed.add(sys.intern(path))
         except Exception as e:
             print(f"Warning: Could not load processed files log: {e}")
 
-        return processed
+        return frozenset(processed)
+
+    def _scandir_recursive(self, path, recursive=True, parent_fd=None, depth=0):
+        """Yield (directory path, os.DirEntry) pairs for files under path
 
-    def scan_directory(self, directory, recursive=True, exclude_processed_log=None):
+        Each directory is opened once and listed through its descriptor,
+        so entry.stat() resolves the name relative to the open directory
+        (fstatat) instead of walking the full path again. Entries must be
+        stat'ed before the generator is advanced past their directory.
+        """
+        try:
+            # Subdirectories are opened relative to their parent's descriptor,
+            # and never through a symlink swapped in after the listing
+            if parent_fd is not None:
+                dir_fd = os.open(os.path.basename(path),
+                                 os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW,
+                                 dir_fd=parent_fd)
+            else:
+                dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+
+        subdirs = []
+        try:
+            # Finish the listing before descending so only dir_fd stays open
+            # per level; the entries keep using it for stat()
+            try:
+                with os.scandir(dir_fd) as it:
+                    entries = list(it)
+            except OSError:
+                return
+
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name not in self.exclude_dirs:
+                        subdir = os.path.join(path, entry.name)
+                        if depth < MAX_OPEN_DIR_FDS:
+                            yield from self._scandir_recursive(
+                                subdir, parent_fd=dir_fd, depth=depth + 1
+                            )
+                        else:
+                            subdirs.append(subdir)
+                elif entry.is_file():
+                    yield path, entry
+        finally:
+            os.close(dir_fd)
+
+        # Past MAX_OPEN_DIR_FDS levels, descend only after closing this
+        # directory and open children by full path, so deep trees can't
+        # run out of file descriptors
+        for subdir in subdirs:
+            yield from self._scandir_recursive(subdir, depth=depth + 1)
+
+    def _scan_one_directory(self, path):
+        """List one directory, returning (path, file entries, subdirectory paths)"""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.exclude_dirs:
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry)
+        except OSError:
+            # Unreadable, vanished or not a directory; skip like the serial walk
+            pass
+        return path, files, subdirs
+
+    def _scandir_parallel(self, path, workers):
+        """Yield (directory path, os.DirEntry) pairs for files under path,
+        listing directories concurrently on a thread pool"""
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {executor.submit(self._scan_one_directory, path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_path, files, subdirs = future.result()
+                    # Queue subdirectories before handing files back so the
+                    # workers stay busy while the caller matches patterns
+                    for subdir in subdirs:
+                        pending.add(executor.submit(self._scan_one_directory, subdir))
+                    for entry in files:
+                        yield dir_path, entry
+
+    def scan_directory(self, directory, recursive=True, exclude_processed_log=None, parallel=1):
         """Scan directory for important files"""
-        important_files = []
+        return list(self.iter_scan_directory(directory, recursive, exclude_processed_log, parallel))
+
+    def iter_scan_directory(self, directory, recursive=True, exclude_processed_log=None, parallel=1):
+        """Scan directory for important files, yielding them as they are found"""
+        # Nothing can match, so don't walk the tree at all
+        if not self._has_patterns:
+            print("Warning: No important_patterns configured - nothing to scan for.")
+            return
 
         # Load processed files to exclude
         processed_files = self._load_processed_files(exclude_processed_log)
@@ -99,53 +290,58 @@ class ImportantFileFinder:
         path = Path(directory).expanduser()
         if not path.exists():
             print(f"Error: Directory '{directory}' does not exist")
-            return []
-
-        # Get all files
-        if recursive:
-            files = path.rglob('*')
-        else:
-            files = path.glob('*')
-
-        for file_path in files:
-            if file_path.is_file():
-                file_path_str = str(file_path)
-
-                # Skip if already processed
-                if file_path_str in processed_files:
-                    continue
+            return
 
-                matches = self._check_file_importance(file_path_str)
-                if matches:
-                    stat = file_path.stat()
-                    important_files.append({
-                        'path': file_path_str,
-                        'name': file_path.name,
-                        'categories': matches,
-                        'size': stat.st_size,
-                        'age_days': self._get_file_age_days(file_path_str),
-                        'modified': datetime.fromtimestamp(stat.st_mtime)
-                    })
+        # File ages are measured against a single timestamp for the scan
+        now_ts = time.time()
 
-        return important_files
+        # Walk files with scandir - type checks come from the directory
+        # listing and matched files need a single stat
+        if recursive and parallel > 1:
+            entries = self._scandir_parallel(path, parallel)
+        else:
+            entries = self._scandir_recursive(path, recursive)
+
+        for dir_path, entry in entries:
+            name = entry.name
+            file_path_str = os.path.join(dir_path, name)
+
+            # Skip if already processed
+            if processed_files and file_path_str in processed_files:
+                continue
+
+            matches = self._check_file_importance(name)
+            if matches:
+                # Follow symlinks so linked files report their target's size
+                stat = entry.stat(follow_symlinks=True)
+                yield {
+                    'path': file_path_str,
+                    'name': name,
+                    'categories': matches,
+                    'size': stat.st_size,
+                    'age_days': int((now_ts - stat.st_mtime) / 86400),
+                    'modified_ts': stat.st_mtime
+                }
 
     def display_results(self, files):
-        """Display found files and prompt for action"""
-        if not files:
-            print("No important files found.")
-            return
-
-        print(f"\n{'='*80}")
-        print(f"Found {len(files)} potentially important file(s)")
-        print(f"{'='*80}\n")
-
-        for idx, file_info in enumerate(files, 1):
-            print(f"\n[{idx}] {file_info['name']}")
+        """Display found files as they arrive, returning how many were shown"""
+        count = 0
+        for count, file_info in enumerate(files, 1):
+            print(f"\n[{count}] {file_info['name']}")
             print(f"    Path: {file_info['path']}")
             print(f"    Categories: {', '.join(file_info['categories'])}")
             print(f"    Size: {self._format_file_size(file_info['size'])}")
             print(f"    Age: {file_info['age_days']} days")
-            print(f"    Modified: {file_info['modified'].strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"    Modified: {self._format_timestamp(file_info['modified_ts'])}")
+
+        if not count:
+            print("No important files found.")
+            return 0
+
+        print(f"\n{'='*80}")
+        print(f"Found {count} potentially important file(s)")
+        print(f"{'='*80}")
+        return count
 
     def _preview_file(self, file_path):
         """Preview file contents based on type"""
@@ -155,16 +351,19 @@ class ImportantFileFinder:
         text_extensions = ['.txt', '.csv', '.log', '.md', '.json', '.xml', '.yaml', '.yml', '.pem', '.key']
         if ext in text_extensions:
             try:
-                with open(file_path, 'r') as f:
-                    lines = f.readlines()[:20]
-                    print("\n" + "─" * 80)
-                    print("PREVIEW (first 20 lines):")
-                    print("─" * 80)
-                    for line in lines:
-                        print(line.rstrip())
-                    if len(lines) == 20:
-                        print("... (file continues)")
-                    print("─" * 80)
+                # Read a bounded chunk so huge files or long lines stay cheap
+                with open(file_path, 'rb') as f:
+                    blob = f.read(PREVIEW_BYTES)
+                all_lines = blob.decode('utf-8', errors='replace').splitlines()
+                lines = all_lines[:20]
+                print("\n" + "─" * 80)
+                print("PREVIEW (first 20 lines):")
+                print("─" * 80)
+                for line in lines:
+                    print(line.rstrip())
+                if len(all_lines) > 20 or len(blob) == PREVIEW_BYTES:
+                    print("... (file continues)")
+                print("─" * 80)
             except Exception as e:
                 print(f"Could not preview: {e}")
         else:
@@ -186,6 +385,7 @@ class ImportantFileFinder:
             print(f"Categories: {', '.join(file_info['categories'])}")
             print(f"Size: {self._format_file_size(file_info['size'])}")
             print(f"Age: {file_info['age_days']} days")
+            print(f"Modified: {self._format_timestamp(file_info['modified_ts'])}")
 
             while True:
                 print("\nWhat would you like to do?")
@@ -209,7 +409,11 @@ class ImportantFileFinder:
                 if choice == 'v':
                     self._preview_file(file_info['path'])
                 elif choice == 'o':
-                    os.system(f"open '{file_info['path']}'")
+                    subprocess.Popen(
+                        ['/usr/bin/open', file_info['path']],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL
+                    )
                     print("File opened.")
                 elif choice in self.quick_destinations:
                     # Quick destination
@@ -358,8 +562,10 @@ class ImportantFileFinder:
                     if delete_choice == 't':
                         # Move to trash using macOS command
                         try:
+                            # Pass the path as an argument rather than quoting
+                            # it into the script source
                             result = subprocess.run(
-                                ['osascript', '-e', f'tell application "Finder" to delete POSIX file "{file_info["path"]}"'],
+                                ['osascript', '-e', TRASH_SCRIPT, file_info['path']],
                                 capture_output=True,
                                 text=True,
                                 check=True
@@ -453,21 +659,32 @@ class ImportantFileFinder:
 
             log_path = Path(save_log).expanduser()
 
-            # Append to existing log or create new
+            # Convert logs from older versions (one JSON document) to JSON
+            # Lines once, so new sessions can simply be appended
+            prefix = b''
             if log_path.exists():
-                with open(log_path, 'r') as f:
-                    try:
-                        existing = json.load(f)
-                        if not isinstance(existing, list):
-                            existing = [existing]
-                    except:
-                        existing = []
-                existing.append(log_data)
-                with open(log_path, 'w') as f:
-                    json.dump(existing, f, indent=2)
-            else:
-                with open(log_path, 'w') as f:
-                    json.dump([log_data], f, indent=2)
+                data = log_path.read_bytes()
+                legacy = self._parse_legacy_log(data)
+                if legacy is not None:
+                    # Rewrite through a temp file so an interrupted
+                    # conversion can't wipe the existing history
+                    tmp_path = log_path.with_name(log_path.name + '.tmp')
+                    with open(tmp_path, 'wb') as f:
+                        f.writelines(_dumps_json(entry) + b'\n' for entry in legacy)
+                    os.replace(tmp_path, log_path)
+                elif data.lstrip().startswith(b'['):
+                    # Keep an unreadable old-style log aside rather than
+                    # mixing this session into it
+                    backup_path = log_path.with_name(log_path.name + '.bak')
+                    log_path.replace(backup_path)
+                    print(f"Warning: Could not read action log; moved it to {backup_path}")
+                elif data and not data.endswith(b'\n'):
+                    # Start this session on its own line after a partial write
+                    prefix = b'\n'
+
+            # One session per line
+            with open(log_path, 'ab') as f:
+                f.write(prefix + _dumps_json(log_data) + b'\n')
 
             print(f"\n✓ Action log saved to: {log_path}")
 
@@ -487,6 +704,13 @@ def main():
         action='store_true',
         help='Do not scan subdirectories'
     )
+    parser.add_argument(
+        '--parallel',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Scan subdirectories with N threads (helps on network/cloud-synced folders, default: 1)'
+    )
     parser.add_argument(
         '--no-interactive',
         action='store_true',
@@ -503,7 +727,7 @@ def main():
     )
     parser.add_argument(
         '--save-log',
-        help='Save action log to JSON file (e.g., --save-log actions.json)'
+        help='Append action log to a JSON Lines file (e.g., --save-log actions.json)'
     )
     parser.add_argument(
         '--force-rescan',
@@ -518,33 +742,35 @@ def main():
     # Use save_log path to exclude previously processed files (unless force-rescan is enabled)
     exclude_log = None if args.force_rescan else (args.save_log if args.save_log else None)
 
-    files = finder.scan_directory(
+    files = finder.iter_scan_directory(
         args.directory,
         recursive=not args.non_recursive,
-        exclude_processed_log=exclude_log
+        exclude_processed_log=exclude_log,
+        parallel=args.parallel
     )
 
+    # Results stream straight to the screen unless they are needed again
+    # for saving or the interactive review
+    if args.save_results or not args.no_interactive:
+        files = list(files)
+
     # Save scan results if requested
     if args.save_results:
         results_path = Path(args.save_results).expanduser()
-        with open(results_path, 'w') as f:
-            json.dump({
+        with open(results_path, 'wb') as f:
+            f.write(_dumps_json({
                 'timestamp': datetime.now().isoformat(),
                 'directory': args.directory,
                 'file_count': len(files),
                 'files': files
-            }, f, indent=2, default=str)
+            }, indent=True))
         print(f"\n✓ Scan results saved to: {results_path}")
 
-    if args.no_interactive:
-        finder.display_results(files)
-    else:
-        finder.display_results(files)
-        if files:
-            print("\n" + "="*80)
-            proceed = input("\nWould you like to review these files interactively? (y/n): ")
-            if proceed.lower() in ['y', 'yes']:
-                finder.interactive_review(files, save_log=args.save_log)
+    finder.display_results(files)
+    if not args.no_interactive and files:
+        proceed = input("\nWould you like to review these files interactively? (y/n): ")
+        if proceed.lower() in ['y', 'yes']:
+            finder.interactive_review(files, save_log=args.save_log)
 
 
 if __name__ == '__main__':